@@ -4,181 +4,304 @@ Cálculo de separaciones entre despegues consecutivos
 Proyecto 3 - PGTA
 """
 
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Optional, Tuple
-from models.DataItems import DataItem
-from functions.geo_utils import calculate_distance_2d, calculate_distance_to_threshold
+from numba import njit
+from typing import Dict, Optional, Tuple
+from models.DataItemArray import DataItemArray
+from functions.data_loader import intern_strings
+from functions.geo_utils import calculate_distance_2d, calculate_distance_to_threshold_vec
 from functions.separation_checker import (
     check_radar_separation,
-    check_wake_turbulence_separation,
-    normalize_wake_category
+    normalize_wake_category,
+    WAKE_CATEGORY_CODES,
+    WAKE_SEPARATION_TABLE
 )
 from functions.normalize_runway import normalize_runway
 import constants
 
 
+# Columnas del plan de vuelo que necesita process_consecutive_pair (en este orden)
+FLIGHT_PLAN_COLUMNS = (
+    'Indicativo', 'HoraDespegue', 'Estela_Norm', 'Estela_Code', 'SID_Norm', 'TipoAeronave'
+)
+
+# Columnas del DataFrame de resultados (orden de las tuplas de process_consecutive_pair)
+RESULT_COLUMNS = (
+    'Callsign_Preceding', 'Callsign_Following', 'ATOT_Preceding', 'ATOT_Following',
+    'Time_Overlap_Seconds', 'ToD_TWR', 'Distance_TWR_NM', 'ToD_Min_TMA',
+    'Min_Distance_TMA_NM', 'Inc_Radar_TWR', 'Inc_Radar_TMA', 'Inc_Wake_TWR',
+    'Inc_Wake_TMA', 'Wake_Separation_Required_NM', 'Wake_Preceding', 'Wake_Following',
+    'SID_Preceding', 'SID_Following', 'Runway', 'Aircraft_Type_Preceding',
+    'Aircraft_Type_Following'
+)
+
+# Tipos fijos de las columnas. Las de estela son nullable: pd.NA donde no
+# aplica separación por estela (en los CSV se escribe 'NA', ver REPORT_NA_COLUMNS)
+RESULT_DTYPES = {
+    'Time_Overlap_Seconds': np.float64,
+    'ToD_TWR': np.float64,
+    'Distance_TWR_NM': np.float64,
+    'ToD_Min_TMA': np.float64,
+    'Min_Distance_TMA_NM': np.float64,
+    'Inc_Radar_TWR': bool,
+    'Inc_Radar_TMA': bool,
+    'Inc_Wake_TWR': 'boolean',
+    'Inc_Wake_TMA': 'boolean',
+    'Wake_Separation_Required_NM': 'Int64',
+}
+
+# Columnas cuyo valor ausente se escribe como 'NA' en los informes CSV
+REPORT_NA_COLUMNS = ('Inc_Wake_TWR', 'Inc_Wake_TMA', 'Wake_Separation_Required_NM')
+
+
 # ============================================================================
 # FUNCIONES AUXILIARES
 # ============================================================================
 
-def group_detections_by_callsign(data_items: List[DataItem]) -> Dict[str, List[DataItem]]:
-    """Agrupa detecciones radar por callsign y las ordena por tiempo."""
-    detections = {}
-    for item in data_items:
-        if item.callsign and item.callsign.strip():
-            if item.callsign not in detections:
-                detections[item.callsign] = []
-            detections[item.callsign].append(item)
+def map_unique_values(column: pd.Series, func) -> pd.Series:
+    """
+    Aplica func a una columna de baja cardinalidad llamándola sólo una vez
+    por valor distinto (en lugar de una vez por fila como .apply).
+    Los nulos (None y NaN) cuentan como un único valor: se agrupan por
+    códigos de pd.factorize en lugar de usarse como claves de un dict,
+    donde None y NaN serían dos claves nulas distintas.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    mapped = pd.Series([func(value) for value in uniques])
+    return mapped.take(codes).set_axis(column.index).rename(column.name)
+
+
+def group_detections_by_callsign(
+    data: DataItemArray,
+    thr_lat: float,
+    thr_lon: float
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Agrupa detecciones radar por callsign y las ordena por tiempo.
+    
+    Cada callsign se guarda como un dict de arrays NumPy paralelos (SoA):
+    'time', 'x', 'y', 'lat', 'lon', 'baro_alt' (NaN si no hay altitud),
+    'in_geo' (máscara del filtro geográfico) y 'dist_thr' (distancia en NM
+    al umbral thr_lat/thr_lon), más los extremos temporales 't_start' y
+    't_end' ya calculados.
+    """
+    # Columnas de todas las detecciones, directamente del SoA
+    callsigns = data.callsign
+    time = data.time
+    fields = {
+        'x': data.x,
+        'y': data.y,
+        'lat': data.lat,
+        'lon': data.lon,
+        'baro_alt': data.barometric_altitude,
+        'in_geo': data.is_in_geographic_filter(),
+    }
+    # Distancia al umbral de todas las detecciones en una sola pasada vectorizada
+    fields['dist_thr'] = calculate_distance_to_threshold_vec(
+        fields['lat'], fields['lon'], thr_lat, thr_lon
+    )
     
-    for callsign in detections:
-        detections[callsign].sort(key=lambda x: x.time)
+    # Descartar callsigns vacíos con una sola operación de columna
+    has_callsign = pd.Series(callsigns, dtype=object).fillna('').astype(str).str.strip().str.len().gt(0)
+    rows = np.flatnonzero(has_callsign.to_numpy())
+    
+    # Groupsort: códigos enteros por callsign (en orden de aparición) y un único
+    # lexsort (callsign, tiempo), estable, que deja cada grupo ya ordenado por
+    # tiempo; los cortes de cada grupo salen de searchsorted
+    codes, unique_callsigns = pd.factorize(callsigns[rows])
+    order = np.lexsort((time[rows], codes))
+    sorted_rows = rows[order]
+    group_bounds = np.searchsorted(codes[order], np.arange(len(unique_callsigns) + 1))
+    
+    detections = {}
+    for k, callsign in enumerate(unique_callsigns):
+        group = sorted_rows[group_bounds[k]:group_bounds[k + 1]]
+        
+        sorted_times = time[group]
+        track = {'time': sorted_times}
+        for name, values in fields.items():
+            track[name] = values[group]
+        track['t_start'] = float(sorted_times[0])
+        track['t_end'] = float(sorted_times[-1])
+        detections[callsign] = track
     
     return detections
 
 
 def find_first_valid_detection(
-    detections: List[DataItem],
-    thr_lat: float,
-    thr_lon: float,
+    track: Dict[str, np.ndarray],
     min_distance_nm: float = constants.DISTANCIA_INICIAL_CALCULO_NM
-) -> Optional[DataItem]:
+) -> Optional[int]:
     """
     Encuentra la primera detección válida (>= 0.5 NM del umbral EN MODO ALEJAMIENTO).
     
-    CORREGIDO: Implementación más robusta.
+    Usa las distancias al umbral ya calculadas en track['dist_thr'].
+    Devuelve el índice de la detección dentro del track (o None).
     """
-    if not detections or len(detections) < 1:
+    if len(track['time']) < 1:
         return None
     
-    # Calcular distancias para todas las detecciones
-    distances = []
-    for det in detections:
-        dist = calculate_distance_to_threshold(det.lat, det.lon, thr_lat, thr_lon)
-        distances.append((det, dist))
+    distances = track['dist_thr']
     
     # Buscar primera detección >= 0.5 NM que esté alejándose
-    for i in range(len(distances)):
-        det_current, dist_current = distances[i]
-        
-        # Verificar distancia mínima
-        if dist_current >= min_distance_nm:
-            # Verificar ALEJAMIENTO si hay detección anterior
-            if i == 0:
-                # Primera detección: aceptar si cumple distancia
-                return det_current
-            else:
-                det_prev, dist_prev = distances[i-1]
-                if dist_current > dist_prev:
-                    # Se está alejando → VÁLIDA
-                    return det_current
-                # Si no se aleja, seguir buscando
+    # (la primera detección se acepta si cumple distancia)
+    far_enough = distances >= min_distance_nm
+    moving_away = np.ones(len(distances), dtype=bool)
+    moving_away[1:] = distances[1:] > distances[:-1]
+    
+    valid = far_enough & moving_away
+    if valid.any():
+        return int(valid.argmax())
     
     # Si no encuentra ninguna alejándose, devolver la primera que cumpla distancia
-    for det, dist in distances:
-        if dist >= min_distance_nm:
-            return det
+    if far_enough.any():
+        return int(far_enough.argmax())
     
     return None
 
 
 def find_concurrent_detection(
-    detections: List[DataItem],
+    track: Dict[str, np.ndarray],
     reference_time: float,
     max_time_diff: float = constants.TOLERANCE_TIME_SECONDS
-) -> Optional[DataItem]:
-    """Encuentra la detección más cercana en tiempo a un momento de referencia."""
-    min_time_diff = float('inf')
-    best_detection = None
-    
-    for det in detections:
-        time_diff = abs(det.time - reference_time)
-        if time_diff < min_time_diff and time_diff < max_time_diff:
-            min_time_diff = time_diff
-            best_detection = det
-    
-    return best_detection
-
-
-def do_flight_trajectories_overlap(
-    preceding_detections: List[DataItem],
-    following_detections: List[DataItem]
-) -> bool:
-    """Verifica si las trayectorias de vuelo se solapan temporalmente."""
-    if not preceding_detections or not following_detections:
-        return False
+) -> Optional[int]:
+    """
+    Encuentra el índice de la detección más cercana en tiempo a un momento de referencia.
     
-    prec_start = min(d.time for d in preceding_detections)
-    prec_end = max(d.time for d in preceding_detections)
+    Los tiempos del track están ordenados: la búsqueda binaria deja como
+    candidatas sólo las dos detecciones que rodean a reference_time.
+    """
+    times = track['time']
+    n = len(times)
+    if n < 1:
+        return None
     
-    foll_start = min(d.time for d in following_detections)
-    foll_end = max(d.time for d in following_detections)
+    idx = int(np.searchsorted(times, reference_time))
+    best = None
+    best_diff = float('inf')
     
-    # Solapamiento si: foll_start < prec_end
-    return foll_start < prec_end
-
-
-def calculate_overlap_duration(
-    preceding_detections: List[DataItem],
-    following_detections: List[DataItem]
-) -> float:
-    """Calcula la duración del solapamiento temporal."""
-    if not preceding_detections or not following_detections:
-        return 0.0
+    if idx > 0:
+        # Primera de las detecciones con ese mismo tiempo (como el barrido lineal)
+        best = int(np.searchsorted(times, times[idx - 1]))
+        best_diff = reference_time - times[best]
     
-    prec_start = min(d.time for d in preceding_detections)
-    prec_end = max(d.time for d in preceding_detections)
+    if idx < n and times[idx] - reference_time < best_diff:
+        best = idx
+        best_diff = times[idx] - reference_time
     
-    foll_start = min(d.time for d in following_detections)
-    foll_end = max(d.time for d in following_detections)
+    if best is not None and best_diff < max_time_diff:
+        return best
     
-    overlap_start = max(prec_start, foll_start)
-    overlap_end = min(prec_end, foll_end)
+    return None
+
+
+def get_time_bounds(
+    preceding_track: Dict[str, np.ndarray],
+    following_track: Dict[str, np.ndarray]
+) -> Tuple[bool, float, float, float, float]:
+    """
+    Devuelve de una vez si las trayectorias se solapan temporalmente y los
+    extremos (prec_start, prec_end, foll_start, foll_end) de ambos tracks.
+    """
+    prec_start, prec_end = preceding_track['t_start'], preceding_track['t_end']
+    foll_start, foll_end = following_track['t_start'], following_track['t_end']
     
-    if overlap_start < overlap_end:
-        return overlap_end - overlap_start
-    else:
-        return 0.0
+    # Solapamiento si: foll_start < prec_end
+    return foll_start < prec_end, prec_start, prec_end, foll_start, foll_end
+
+
+@njit('Tuple((b1, f8, f8))(f8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8)',
+      cache=True, nogil=True)
+def _min_tma_kernel(px, py, pt, fx, fy, ft, time_tol):
+    """
+    Núcleo compilado de la mínima distancia TMA: recorre todas las parejas
+    (siguiente, precedente) con |Δt| <= time_tol sin crear arrays temporales.
+    Devuelve (encontrado, distancia, tiempo del siguiente); si no hay
+    ninguna pareja dentro de la tolerancia, (False, NaN, NaN).
+    Sin fastmath: el mínimo parte de inf y se compara con él.
+    
+    pt y ft están ordenados: para cada detección del siguiente sólo se
+    visita la ventana [lo, hi) de precedentes dentro de la tolerancia,
+    y ambos punteros avanzan de forma monótona.
+    
+    No se usa índice espacial (rejilla): cada track precedente sólo se
+    consulta desde un único siguiente (el despegue posterior) y la ventana
+    de ±30 s ya deja unas pocas candidatas por detección.
+    """
+    found = False
+    min_d2 = np.inf
+    min_t = 0.0
+    n_prec = px.size
+    lo = 0
+    hi = 0
+    for j in range(fx.size):
+        while lo < n_prec and pt[lo] - ft[j] < -time_tol:
+            lo += 1
+        while hi < n_prec and pt[hi] - ft[j] <= time_tol:
+            hi += 1
+        for i in range(lo, hi):
+            # Poda por caja: si una sola componente ya no mejora el mínimo
+            # actual, la distancia completa tampoco puede hacerlo
+            dx = px[i] - fx[j]
+            dx2 = dx * dx
+            if dx2 >= min_d2:
+                continue
+            dy = py[i] - fy[j]
+            dy2 = dy * dy
+            if dy2 >= min_d2:
+                continue
+            d2 = dx2 + dy2
+            if d2 < min_d2:
+                min_d2 = d2
+                min_t = ft[j]
+                found = True
+    if not found:
+        return False, np.nan, np.nan
+    return True, math.sqrt(min_d2), min_t
 
 
 def calculate_minimum_tma_distance(
-    preceding_detections: List[DataItem],
-    following_detections: List[DataItem],
+    preceding_track: Dict[str, np.ndarray],
+    following_track: Dict[str, np.ndarray],
     first_valid_time: float
-) -> Tuple[float, Optional[float]]:
-    """Calcula la mínima distancia en zona TMA entre dos aeronaves."""
-    min_distance = float('inf')
-    min_time = None
-    
-    following_filtered = [d for d in following_detections if d.time > first_valid_time]
+) -> Tuple[float, float]:
+    """
+    Calcula la mínima distancia en zona TMA entre dos aeronaves.
+    Devuelve (NaN, NaN) si no hay ninguna pareja de detecciones comparable.
+    """
+    min_distance = np.nan
+    min_time = np.nan
     
-    if not following_filtered:
+    foll_mask = following_track['time'] > first_valid_time
+    if not foll_mask.any():
         return min_distance, min_time
     
-    foll_time_start = following_filtered[0].time
-    foll_time_end = following_filtered[-1].time
+    fx = following_track['x'][foll_mask]
+    fy = following_track['y'][foll_mask]
+    ft = following_track['time'][foll_mask]
     
-    preceding_filtered = [
-        d for d in preceding_detections
-        if d.is_in_geographic_filter() and
-           (not d.barometric_altitude or d.barometric_altitude <= 6000) and
-           foll_time_start <= d.time <= foll_time_end
-    ]
-    
-    if not preceding_filtered:
+    pt_all = preceding_track['time']
+    prec_mask = (
+        preceding_track['in_geo'] &
+        ~(preceding_track['baro_alt'] > 6000) &
+        (pt_all >= ft[0]) & (pt_all <= ft[-1])
+    )
+    if not prec_mask.any():
         return min_distance, min_time
     
-    for foll_det in following_filtered:
-        for prec_det in preceding_filtered:
-            time_diff = abs(prec_det.time - foll_det.time)
-            if time_diff > 30:
-                continue
-            
-            dist = calculate_distance_2d(prec_det.x, prec_det.y, foll_det.x, foll_det.y)
-            if dist < min_distance:
-                min_distance = dist
-                min_time = foll_det.time
+    px = preceding_track['x'][prec_mask]
+    py = preceding_track['y'][prec_mask]
+    pt = pt_all[prec_mask]
+    
+    found, dist, t = _min_tma_kernel(px, py, pt, fx, fy, ft, 30.0)
+    if not found:
+        return min_distance, min_time
     
-    return min_distance, min_time
+    return dist, t
 
 
 # ============================================================================
@@ -186,17 +309,22 @@ def calculate_minimum_tma_distance(
 # ============================================================================
 
 def process_consecutive_pair(
-    preceding: pd.Series,
-    following: pd.Series,
-    detections: Dict[str, List[DataItem]],
-    thr_lat: float,
-    thr_lon: float,
+    preceding: tuple,
+    following: tuple,
+    detections: Dict[str, Dict[str, np.ndarray]],
     runway: str
-) -> Optional[Dict]:
-    """Procesa una pareja de despegues consecutivos con DEBUG."""
+) -> Optional[tuple]:
+    """
+    Procesa una pareja de despegues consecutivos con DEBUG.
+    Devuelve una tupla con los campos de RESULT_COLUMNS (o None).
+    
+    preceding/following son tuplas de plan de vuelo con el orden de
+    FLIGHT_PLAN_COLUMNS (Indicativo, HoraDespegue, Estela ya normalizada,
+    su código en WAKE_CATEGORY_CODES, SID ya normalizado, TipoAeronave).
+    """
     
-    prec_callsign = preceding['Indicativo']
-    foll_callsign = following['Indicativo']
+    prec_callsign, prec_atot, prec_wake, prec_wake_code, prec_sid, prec_type = preceding
+    foll_callsign, foll_atot, foll_wake, foll_wake_code, foll_sid, foll_type = following
     
     # DEBUG: Mostrar qué está pasando
     debug_mode = False  # Cambia a True para ver detalles
@@ -209,94 +337,97 @@ def process_consecutive_pair(
     prec_dets = detections[prec_callsign]
     foll_dets = detections[foll_callsign]
     
-    if not do_flight_trajectories_overlap(prec_dets, foll_dets):
+    overlaps, prec_start, prec_end, foll_start, foll_end = get_time_bounds(prec_dets, foll_dets)
+    
+    if not overlaps:
         if debug_mode:
             print(f"  ❌ {prec_callsign}/{foll_callsign}: No solapan temporalmente")
         return None
     
-    prec_first_time = min(d.time for d in prec_dets)
-    foll_first_time = min(d.time for d in foll_dets)
-    
-    if foll_first_time <= prec_first_time:
+    if foll_start <= prec_start:
         if debug_mode:
             print(f"  ❌ {prec_callsign}/{foll_callsign}: Orden temporal incorrecto")
         return None
     
-    first_valid_foll = find_first_valid_detection(foll_dets, thr_lat, thr_lon)
-    if not first_valid_foll:
+    first_valid_foll = find_first_valid_detection(foll_dets)
+    if first_valid_foll is None:
         if debug_mode:
             print(f"  ❌ {prec_callsign}/{foll_callsign}: Sin primera detección válida del siguiente")
         return None
     
-    prec_at_time = find_concurrent_detection(prec_dets, first_valid_foll.time)
-    if not prec_at_time:
+    foll_time = float(foll_dets['time'][first_valid_foll])
+    
+    prec_at_time = find_concurrent_detection(prec_dets, foll_time)
+    if prec_at_time is None:
         if debug_mode:
             print(f"  ❌ {prec_callsign}/{foll_callsign}: Sin detección concurrente del precedente")
         return None
     
     # ZONA TWR
     dist_twr = calculate_distance_2d(
-        prec_at_time.x, prec_at_time.y,
-        first_valid_foll.x, first_valid_foll.y
+        prec_dets['x'][prec_at_time], prec_dets['y'][prec_at_time],
+        foll_dets['x'][first_valid_foll], foll_dets['y'][first_valid_foll]
     )
     
     inc_radar_twr = check_radar_separation(dist_twr, zone='TWR')
     
-    prec_wake = normalize_wake_category(preceding.get('Estela'))
-    foll_wake = normalize_wake_category(following.get('Estela'))
-    
-    inc_wake_twr, wake_sep_req = check_wake_turbulence_separation(
-        prec_wake, foll_wake, dist_twr, True
-    )
+    # Separación por estela requerida (0 = no aplica): una consulta a la tabla
+    wake_sep_req = WAKE_SEPARATION_TABLE[prec_wake_code, foll_wake_code].item()
+    inc_wake_twr = dist_twr < wake_sep_req
     
     # ZONA TMA
     min_dist_tma, min_time_tma = calculate_minimum_tma_distance(
-        prec_dets, foll_dets, first_valid_foll.time
+        prec_dets, foll_dets, foll_time
     )
     
     inc_radar_tma = False
     inc_wake_tma = False
     
-    if min_dist_tma != float('inf'):
+    if not math.isnan(min_dist_tma):
         inc_radar_tma = check_radar_separation(min_dist_tma, zone='TMA')
-        inc_wake_tma, _ = check_wake_turbulence_separation(
-            prec_wake, foll_wake, min_dist_tma, True
-        )
+        # Sin mínimo de estela aplicable el resultado es NA: no se evalúa
+        if wake_sep_req:
+            inc_wake_tma = min_dist_tma < wake_sep_req
     
     if debug_mode:
         print(f"  ✅ {prec_callsign}/{foll_callsign}: TWR={dist_twr:.2f} NM, TMA={min_dist_tma:.2f} NM")
     
-    return {
-        'Callsign_Preceding': prec_callsign,
-        'Callsign_Following': foll_callsign,
-        'ATOT_Preceding': preceding['HoraDespegue'],
-        'ATOT_Following': following['HoraDespegue'],
-        'Time_Overlap_Seconds': calculate_overlap_duration(prec_dets, foll_dets),
-        'ToD_TWR': first_valid_foll.time,
-        'Distance_TWR_NM': round(dist_twr, 2),
-        'ToD_Min_TMA': min_time_tma if min_time_tma else '',
-        'Min_Distance_TMA_NM': round(min_dist_tma, 2) if min_dist_tma != float('inf') else '',
-        'Inc_Radar_TWR': inc_radar_twr,
-        'Inc_Radar_TMA': inc_radar_tma,
-        'Inc_Wake_TWR': inc_wake_twr if wake_sep_req else 'NA',
-        'Inc_Wake_TMA': inc_wake_tma if wake_sep_req else 'NA',
-        'Wake_Separation_Required_NM': wake_sep_req if wake_sep_req else 'NA',
-        'Wake_Preceding': prec_wake,
-        'Wake_Following': foll_wake,
-        'SID_Preceding': preceding.get('ProcDesp', 'NO_SID') or 'NO_SID',
-        'SID_Following': following.get('ProcDesp', 'NO_SID') or 'NO_SID',
-        'Runway': runway,
-        'Aircraft_Type_Preceding': preceding.get('TipoAeronave', 'UNKNOWN'),
-        'Aircraft_Type_Following': following.get('TipoAeronave', 'UNKNOWN')
-    }
+    return (
+        prec_callsign,
+        foll_callsign,
+        prec_atot,
+        foll_atot,
+        max(0.0, min(prec_end, foll_end) - max(prec_start, foll_start)),
+        foll_time,
+        dist_twr,
+        min_time_tma,
+        min_dist_tma,
+        inc_radar_twr,
+        inc_radar_tma,
+        inc_wake_twr if wake_sep_req else pd.NA,
+        inc_wake_tma if wake_sep_req else pd.NA,
+        wake_sep_req if wake_sep_req else pd.NA,
+        prec_wake,
+        foll_wake,
+        prec_sid,
+        foll_sid,
+        runway,
+        prec_type,
+        foll_type
+    )
 
 
 def calculate_separations_between_consecutive_departures(
-    data_items: List[DataItem],
+    data: DataItemArray,
     flight_plans: pd.DataFrame,
-    runway: str
+    runway: str,
+    n_jobs: int = 1
 ) -> pd.DataFrame:
-    """Calcula las separaciones entre despegues consecutivos."""
+    """
+    Calcula las separaciones entre despegues consecutivos.
+    
+    n_jobs: hilos para procesar las parejas (1 = secuencial, < 1 = todos los núcleos).
+    """
     
     print(f"\n{'='*80}")
     print(f"Calculando separaciones para RWY {runway}...")
@@ -307,12 +438,21 @@ def calculate_separations_between_consecutive_departures(
     else:
         thr_lat, thr_lon = constants.THR_06R_LAT, constants.THR_06R_LON
     
-    detections_by_callsign = group_detections_by_callsign(data_items)
+    detections_by_callsign = group_detections_by_callsign(data, thr_lat, thr_lon)
     print(f"✓ Detectados {len(detections_by_callsign)} callsigns únicos")
     
-    flight_plans['PistaDesp_Norm'] = flight_plans['PistaDesp'].apply(normalize_runway)
+    flight_plans['PistaDesp_Norm'] = map_unique_values(flight_plans['PistaDesp'], normalize_runway)
     dep_runway = flight_plans[flight_plans['PistaDesp_Norm'] == runway].copy()
     dep_runway = dep_runway.sort_values('HoraDespegue')
+    # Internados como en el loader (object dtype), para que las búsquedas
+    # contra las claves del radar comparen primero por identidad
+    dep_runway['Indicativo'] = pd.Series(
+        intern_strings(dep_runway['Indicativo']), index=dep_runway.index, dtype=object
+    )
+    dep_runway['Estela_Norm'] = map_unique_values(dep_runway['Estela'], normalize_wake_category)
+    dep_runway['Estela_Code'] = dep_runway['Estela_Norm'].map(WAKE_CATEGORY_CODES)
+    # SID vacío → 'NO_SID' (mismo criterio que `sid or 'NO_SID'`, en una sola operación)
+    dep_runway['SID_Norm'] = dep_runway['ProcDesp'].where(dep_runway['ProcDesp'].astype(bool), 'NO_SID')
     print(f"✓ {len(dep_runway)} despegues programados")
     
     fp_callsigns = set(dep_runway['Indicativo'].unique())
@@ -324,36 +464,43 @@ def calculate_separations_between_consecutive_departures(
         print("⚠️  WARNING: No hay callsigns comunes")
         return pd.DataFrame()
     
-    results = []
-    skip_reasons = {
-        'no_detections': 0,
-        'no_overlap': 0,
-        'wrong_order': 0,
-        'no_first_valid': 0,
-        'no_concurrent': 0,
-        'other': 0
-    }
+    # Sólo parejas consecutivas en las que ambos vuelos tienen detecciones radar
+    has_radar = dep_runway['Indicativo'].isin(common_callsigns).to_numpy()
+    candidate_pairs = np.flatnonzero(has_radar[:-1] & has_radar[1:])
+    
+    # Columnas del plan de vuelo como tuplas planas (evita construir una
+    # pd.Series por fila con iloc)
+    fp_rows = list(dep_runway[list(FLIGHT_PLAN_COLUMNS)].itertuples(index=False, name=None))
+    
+    # process_consecutive_pair valida cada caso y devuelve None en lugar de
+    # lanzar excepciones, así que el bucle no necesita try/except (cualquier
+    # error inesperado llega al manejador de main)
+    def process_pair(i: int) -> Optional[tuple]:
+        return process_consecutive_pair(
+            fp_rows[i],
+            fp_rows[i + 1],
+            detections_by_callsign,
+            runway
+        )
+    
+    # Las parejas son independientes: con n_jobs != 1 se reparten entre hilos
+    # (el núcleo TMA compilado libera el GIL). executor.map conserva el orden.
+    if n_jobs == 1:
+        outcomes = [process_pair(i) for i in candidate_pairs]
+    else:
+        max_workers = os.cpu_count() if n_jobs < 1 else n_jobs
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = list(executor.map(process_pair, candidate_pairs))
+    
+    results = [result for result in outcomes if result is not None]
+    
+    # Tuplas + esquema fijo: sin inferencia de tipos columna a columna
+    results_df = pd.DataFrame.from_records(results, columns=RESULT_COLUMNS).astype(RESULT_DTYPES)
+    if len(results_df) > 0:
+        # Redondeo vectorizado (los NaN de TMA se escriben vacíos en el CSV)
+        distance_cols = ['Distance_TWR_NM', 'Min_Distance_TMA_NM']
+        results_df[distance_cols] = results_df[distance_cols].round(2)
     
-    for i in range(len(dep_runway) - 1):
-        try:
-            result = process_consecutive_pair(
-                dep_runway.iloc[i],
-                dep_runway.iloc[i + 1],
-                detections_by_callsign,
-                thr_lat,
-                thr_lon,
-                runway
-            )
-            
-            if result:
-                results.append(result)
-                
-        except Exception as e:
-            print(f"⚠️  Error procesando pareja {i}: {str(e)}")
-            skip_reasons['other'] += 1
-            continue
-    
-    results_df = pd.DataFrame(results)
     total_pairs = len(dep_runway) - 1
     analyzed = len(results_df)
     skipped = total_pairs - analyzed
@@ -4,11 +4,18 @@ Proyecto 3 - PGTA
 """
 
 from datetime import datetime
-from typing import List
+import contextlib
+import io
+from typing import List, Tuple
+import numpy as np
 import pandas as pd
 import math
-from functions.geo_utils import geodetic_to_stereographic
+import os
+import sys
+from functions.geo_utils import geodetic_to_stereographic, geodetic_to_stereographic_batch
+from functions.geo_kernels import barometric_altitude_kernel
 from models.DataItems import DataItem
+from models.DataItemArray import DataItemArray
 
 
 def parse_value(value):
@@ -57,141 +64,274 @@ def parse_time_string(time_str: str) -> float:
             return 0.0
 
 
-def parse_csv_to_dataitem_list(csv_file: str) -> List[DataItem]:
+def parse_time_column(column: pd.Series) -> np.ndarray:
     """
-    Lee el archivo CSV decodificado y crea lista de objetos DataItem.
+    Versión vectorizada de parse_time_string para una columna completa.
+    Separa HH:MM:SS[:ffffff] con una expresión regular y calcula los
+    segundos con aritmética entera; la fracción se rellena a la derecha
+    hasta 6 dígitos, igual que %f ('828' → 0.828 s).
+    Las filas que no encajan pasan por parse_time_string.
+    """
+    text = column.astype(str)
+    parts = text.str.extract(r'^(\d{1,2}):(\d{1,2}):(\d{1,2})(?::(\d{1,6}))?$')
     
-    Args:
-        csv_file: Ruta al archivo CSV con datos CAT048 decodificados
+    hours = pd.to_numeric(parts[0]).to_numpy(dtype=np.float64, na_value=np.nan)
+    minutes = pd.to_numeric(parts[1]).to_numpy(dtype=np.float64, na_value=np.nan)
+    seconds = pd.to_numeric(parts[2]).to_numpy(dtype=np.float64, na_value=np.nan)
+    micros = pd.to_numeric(parts[3].fillna('0').str.ljust(6, '0')).to_numpy(dtype=np.float64)
     
-    Returns:
-        Lista de objetos DataItem con callsign válido
+    # Mismos rangos que acepta strptime (%H, %M, %S)
+    ok = (hours <= 23) & (minutes <= 59) & (seconds <= 61)
+    
+    result = np.zeros(len(text), dtype=np.float64)
+    result[ok] = (hours[ok] * 3600 + minutes[ok] * 60 + seconds[ok]) + micros[ok] / 1e6
+    for idx in np.flatnonzero(~ok):
+        result[idx] = parse_time_string(str(column.iat[idx]))
+    
+    return result
+
+
+def parse_numeric_column(column: pd.Series) -> np.ndarray:
+    """
+    Versión vectorizada de parse_value para una columna completa.
+    Devuelve un array float64 con NaN donde parse_value devolvería None
+    ('NV', vacíos, texto no numérico, NaN o infinitos).
+    """
+    if pd.api.types.is_numeric_dtype(column):
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        text = column.astype(str).str.strip().str.replace(',', '.', regex=False)
+        values = pd.to_numeric(text, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def parse_track_number_column(column: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    TN como int(valor) de cada fila (NaN → 0), igual que al crear un
+    DataItem. int se evalúa una vez por valor distinto. Devuelve
+    (números de track, máscara de filas en las que int falla).
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    values = np.zeros(len(uniques), dtype=np.int64)
+    invalid = np.zeros(len(uniques), dtype=bool)
+    for k, value in enumerate(uniques):
+        if pd.isna(value):
+            continue
+        try:
+            values[k] = int(value)
+        except (ValueError, TypeError, OverflowError):
+            invalid[k] = True
+    return values[codes], invalid[codes]
+
+
+def row_error_message(track_number, lat: float, lon: float) -> str:
+    """
+    Mensaje de error de una fila descartada en parse_csv_chunk: el de la
+    primera operación que falla al crear su DataItem (int del TN y después
+    la proyección).
+    """
+    try:
+        if pd.notna(track_number):
+            int(track_number)
+        geodetic_to_stereographic(float(lat), float(lon))
+    except (ValueError, TypeError, OverflowError) as e:
+        return str(e)
+    return ''
+
+
+def get_column(df: pd.DataFrame, name: str, default=None) -> pd.Series:
+    """Devuelve la columna name del DataFrame o una columna constante con default."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([default] * len(df), index=df.index, dtype=object)
+
+
+def optional_strings(column: pd.Series) -> list:
+    """Lista de str(valor).strip() por fila, con None donde el valor es NaN."""
+    present = column.notna().to_numpy()
+    text = column.astype(str).str.strip().tolist()
+    return [value if ok else None for value, ok in zip(text, present)]
+
+
+# Columnas del CSV que usa el loader (el resto no se parsea)
+CSV_COLUMNS = {
+    'Time', 'TN', 'TI', 'TA', 'Mode3/A', 'LAT', 'LON', 'H(m)', 'RHO', 'THETA',
+    'FL', 'STAT', 'BP', 'RA', 'TTA', 'GS', 'TAR', 'TAS', 'HDG', 'IAS', 'BAR', 'IVV',
+}
+
+# Columnas de texto: tipo fijo para que todos los bloques del CSV se lean
+# igual (si no, pandas infiere el tipo por bloque y p.ej. '0437' → 437)
+TEXT_COLUMNS = {'Time': str, 'Mode3/A': str, 'TA': str, 'TI': str, 'STAT': str}
+
+
+def object_column(values: list) -> np.ndarray:
+    """Array 1-D de objetos (str/None) a partir de una lista."""
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+
+def intern_strings(column: pd.Series) -> np.ndarray:
+    """
+    Array de objetos con los valores de column internados (sys.intern),
+    llamando a sys.intern una vez por valor distinto. Se devuelve con
+    dtype object: una columna str de pandas crea un objeto nuevo en cada
+    acceso y perdería la identidad de los valores internados.
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    interned = object_column([sys.intern(v) if isinstance(v, str) else v for v in uniques])
+    return interned[codes]
+
+
+def parse_csv_chunk(df: pd.DataFrame, stats: dict) -> DataItemArray:
+    """
+    Parsea un bloque del CSV (ver parse_csv_to_dataitem_array) y acumula
+    sus contadores en stats.
+    """
+    stats['rows'] += len(df)
+    
+    # CRÍTICO: Verificar callsign PRIMERO
+    ti = get_column(df, 'TI', '')
+    callsign = ti.astype(str).str.strip()
+    has_callsign = (ti.notna() & ~callsign.str.lower().isin(['nan', '', 'none'])).to_numpy()
+    stats['no_callsign'] += int((~has_callsign).sum())
+    
+    # Validar coordenadas esenciales
+    lat = parse_numeric_column(get_column(df, 'LAT', 0))
+    lon = parse_numeric_column(get_column(df, 'LON', 0))
+    has_coords = ~np.isnan(lat) & ~np.isnan(lon) & (lat != 0) & (lon != 0)
+    stats['no_coords'] += int((has_callsign & ~has_coords).sum())
+    
+    # IMPORTANTE: Filtrar aeronaves on-ground
+    stat = get_column(df, 'STAT', '')
+    flight_status = stat.astype(str).str.strip().where(stat.notna(), 'nan')
+    on_ground = flight_status.str.lower().str.contains('ground', regex=False).to_numpy()
+    candidates = has_callsign & has_coords
+    stats['on_ground'] += int((candidates & on_ground).sum())
+    candidates &= ~on_ground
+    
+    # Tiempo, TN y proyección de las candidatas. Igual que al crear cada
+    # DataItem, un TN que int no acepta o unas coordenadas que la proyección
+    # rechaza (fuera de rango, antípoda) son un error de fila
+    cand_rows = np.flatnonzero(candidates)
+    cand = df.iloc[cand_rows]
+    time = parse_time_column(get_column(cand, 'Time', '0'))
+    tn_column = get_column(cand, 'TN', 0)
+    track_number, bad_tn = parse_track_number_column(tn_column)
+    
+    # Calcular coordenadas proyectadas (todo el lote en una llamada)
+    x, y, projectable = geodetic_to_stereographic_batch(lat[cand_rows], lon[cand_rows])
+    
+    errors = bad_tn | ~projectable
+    for pos in np.flatnonzero(errors)[:max(0, 5 - stats['errors'])]:
+        message = row_error_message(tn_column.iat[pos], lat[cand_rows[pos]], lon[cand_rows[pos]])
+        print(f"⚠️  Error fila {cand.index[pos]}: {message}")
+    stats['errors'] += int(errors.sum())
+    
+    keep = ~errors
+    rows = cand_rows[keep]
+    stats['valid'] += len(rows)
+    sub = df.iloc[rows]
+    lat = lat[rows]
+    lon = lon[rows]
+    time = time[keep]
+    track_number = track_number[keep]
+    x = x[keep]
+    y = y[keep]
+    
+    # Parsear campos numéricos por columna
+    def numeric(name: str) -> np.ndarray:
+        return parse_numeric_column(get_column(sub, name))
+    
+    h = np.nan_to_num(numeric('H(m)'), nan=0.0)
+    rho = np.nan_to_num(numeric('RHO'), nan=0.0)
+    theta = np.nan_to_num(numeric('THETA'), nan=0.0)
+    fl = numeric('FL')
+    
+    # Parsear QNH si está disponible (del BDS 4.0 BP)
+    bp = numeric('BP')
+    
+    # CORRECCIÓN QNH CORRECTA
+    # Convertir FL a pies; por DEBAJO de 6000 ft se aplica corrección QNH
+    # (1 hPa ≈ 27 pies, QNH validado en 900-1100 hPa, si no QNE), por ENCIMA
+    # se usa FL directamente (ya está en QNE). Si no hay FL, usar H(m)
+    barometric_altitude = barometric_altitude_kernel(fl, h, bp)
+    
+    return DataItemArray(
+        time=time,
+        track_number=track_number,
+        callsign=intern_strings(callsign.iloc[rows]),
+        target_address=object_column(optional_strings(get_column(sub, 'TA'))),
+        mode_3a=object_column(optional_strings(get_column(sub, 'Mode3/A'))),
+        rho=rho,
+        theta=theta,
+        lat=lat,
+        lon=lon,
+        h=h,
+        x=x,
+        y=y,
+        fl=fl,
+        barometric_altitude=barometric_altitude,
+        flight_status=object_column(flight_status.iloc[rows].tolist()),
+        bds40_bp=bp,
+        bds50_roll_angle=numeric('RA'),
+        bds50_true_track_angle=numeric('TTA'),
+        bds50_ground_speed=numeric('GS'),
+        bds50_track_angle_rate=numeric('TAR'),
+        bds50_true_airspeed=numeric('TAS'),
+        bds60_magnetic_heading=numeric('HDG'),
+        bds60_indicated_airspeed=numeric('IAS'),
+        bds60_barometric_altitude_rate=numeric('BAR'),
+        bds60_inertial_vertical_velocity=numeric('IVV'),
+    )
+
+
+def iter_csv_chunks(csv_file: str, stats: dict, chunksize: int = 100_000):
+    """
+    Generador de DataItemArray, uno por bloque de chunksize filas del CSV.
+    Acumula en stats los contadores de parse_csv_chunk y, al agotarse,
+    informa del total de filas leídas.
+    
+    Los avisos por fila (errores, formato de tiempo) se guardan y se
+    escriben después del total, en el mismo orden que cuando el archivo
+    se leía de una vez y el total se conocía antes de parsear.
     """
     print(f"Cargando datos desde {csv_file}...")
-    df = pd.read_csv(csv_file, sep=';')
     
-    print(f"Columnas disponibles: {list(df.columns)}")
-    print(f"Total filas en CSV: {len(df)}")
+    # Sólo la cabecera, para informar de todas las columnas del archivo
+    print(f"Columnas disponibles: {list(pd.read_csv(csv_file, sep=';', nrows=0).columns)}")
     
-    data_items = []
-    stats = {
+    reader = pd.read_csv(
+        csv_file, sep=';', decimal=',',
+        usecols=lambda name: name in CSV_COLUMNS,
+        dtype=TEXT_COLUMNS,
+        chunksize=chunksize
+    )
+    row_messages = io.StringIO()
+    for chunk in reader:
+        with contextlib.redirect_stdout(row_messages):
+            data = parse_csv_chunk(chunk, stats)
+        yield data
+    
+    print(f"Total filas en CSV: {stats['rows']}")
+    sys.stdout.write(row_messages.getvalue())
+
+
+def new_load_stats() -> dict:
+    """Contadores de carga que rellena parse_csv_chunk."""
+    return {
+        'rows': 0,
         'no_callsign': 0,
         'no_coords': 0,
         'on_ground': 0,
         'errors': 0,
         'valid': 0
     }
-    
-    for idx, row in df.iterrows():
-        try:
-            # CRÍTICO: Verificar callsign PRIMERO
-            callsign_value = str(row.get('TI', '')).strip()
-            
-            if not callsign_value or callsign_value.lower() in ['nan', '', 'none']:
-                stats['no_callsign'] += 1
-                continue
-            
-            # Parsear valores numéricos
-            lat = parse_value(row.get('LAT', 0))
-            lon = parse_value(row.get('LON', 0))
-            h = parse_value(row.get('H(m)', 0))
-            
-            # Validar coordenadas esenciales
-            if lat is None or lon is None or lat == 0 or lon == 0:
-                stats['no_coords'] += 1
-                continue
-            
-            # IMPORTANTE: Filtrar aeronaves on-ground
-            flight_status = str(row.get('STAT', '')).strip()
-            if 'ground' in flight_status.lower():
-                stats['on_ground'] += 1
-                continue  # ← CORREGIDO: Saltar SIEMPRE si on-ground
-            
-            # Parsear tiempo
-            time_str = str(row.get('Time', '0'))
-            time = parse_time_string(time_str)
-            
-            # Parsear otros campos
-            rho = parse_value(row.get('RHO', 0))
-            theta = parse_value(row.get('THETA', 0))
-            fl = parse_value(row.get('FL', None))
-            
-            # Parsear QNH si está disponible (del BDS 4.0 BP)
-            bp = parse_value(row.get('BP', None))
-            
-            # *** CORREGIDO: Validar rango de QNH ***
-            qnh = 1013.25  # Default QNE
-            if bp is not None and 900 < bp < 1100:  # Rango válido de presión
-                qnh = bp
-            
-            ra = parse_value(row.get('RA', None))
-            tta = parse_value(row.get('TTA', None))
-            gs = parse_value(row.get('GS', None))
-            tar = parse_value(row.get('TAR', None))
-            tas = parse_value(row.get('TAS', None))
-            hdg = parse_value(row.get('HDG', None))
-            ias = parse_value(row.get('IAS', None))
-            bar = parse_value(row.get('BAR', None))
-            ivv = parse_value(row.get('IVV', None))
-            
-            # Crear DataItem
-            item = DataItem(
-                time=float(time),
-                track_number=int(row.get('TN', 0)) if pd.notna(row.get('TN')) else 0,
-                callsign=callsign_value,
-                target_address=str(row.get('TA', '')).strip() if pd.notna(row.get('TA')) else None,
-                mode_3a=str(row.get('Mode3/A', '')).strip() if pd.notna(row.get('Mode3/A')) else None,
-                rho=float(rho) if rho is not None else 0,
-                theta=float(theta) if theta is not None else 0,
-                lat=float(lat),
-                lon=float(lon),
-                h=float(h) if h is not None else 0,
-                fl=float(fl) if fl is not None else None,
-                flight_status=flight_status,
-                bds40_bp=float(bp) if bp is not None else None,
-                bds50_roll_angle=float(ra) if ra is not None else None,
-                bds50_true_track_angle=float(tta) if tta is not None else None,
-                bds50_ground_speed=float(gs) if gs is not None else None,
-                bds50_track_angle_rate=float(tar) if tar is not None else None,
-                bds50_true_airspeed=float(tas) if tas is not None else None,
-                bds60_magnetic_heading=float(hdg) if hdg is not None else None,
-                bds60_indicated_airspeed=float(ias) if ias is not None else None,
-                bds60_barometric_altitude_rate=float(bar) if bar is not None else None,
-                bds60_inertial_vertical_velocity=float(ivv) if ivv is not None else None,
-            )
-
-            # Calcular coordenadas proyectadas
-            x, y = geodetic_to_stereographic(item.lat, item.lon)
-            item.x = x
-            item.y = y
-
-            # CORRECCIÓN QNH CORRECTA
-            if item.fl is not None:
-                # Convertir FL a pies
-                fl_feet = item.fl * 100
-                
-                # Por DEBAJO de 6000 ft: Aplicar corrección QNH
-                if fl_feet <= 6000:
-                    # Corrección: 1 hPa ≈ 27 pies
-                    qnh_correction = (qnh - 1013.25) * 27
-                    item.barometric_altitude = fl_feet + qnh_correction
-                else:
-                    # Por ENCIMA de 6000 ft: Usar FL directamente (ya está en QNE)
-                    item.barometric_altitude = fl_feet
-            else:
-                # Si no hay FL, usar H(m) convertido a pies
-                item.barometric_altitude = item.h
-            
-            # *** CRÍTICO: AÑADIR ITEM A LA LISTA ***
-            data_items.append(item)
-            stats['valid'] += 1
-            
-        except Exception as e:
-            stats['errors'] += 1
-            if stats['errors'] <= 5:
-                print(f"⚠️  Error fila {idx}: {str(e)}")
-    
-    # Resumen
+
+
+def print_load_summary(stats: dict, unique_callsigns: set):
+    """Resumen de la carga del CSV."""
     print(f"\n✓ Procesamiento completado:")
     print(f"  - Registros válidos: {stats['valid']}")
     print(f"  - Sin callsign: {stats['no_callsign']}")
@@ -200,52 +340,162 @@ def parse_csv_to_dataitem_list(csv_file: str) -> List[DataItem]:
     print(f"  - Errores: {stats['errors']}")
     
     # Debug: Callsigns únicos
-    unique_callsigns = set([item.callsign for item in data_items])
     print(f"✓ Callsigns únicos: {len(unique_callsigns)}")
     if len(unique_callsigns) > 0:
         sample = sorted(list(unique_callsigns))[:10]
         print(f"  Ejemplos: {', '.join(sample)}")
+
+
+def parse_csv_to_dataitem_array(csv_file: str, chunksize: int = 100_000) -> DataItemArray:
+    """
+    Lee el archivo CSV decodificado y crea un DataItemArray (SoA).
+    
+    El parseo se hace por columnas (pandas/NumPy) y los arrays se guardan
+    directamente, sin crear un objeto DataItem por fila. El CSV se lee en
+    bloques de chunksize filas, de modo que sólo un bloque del DataFrame
+    está en memoria a la vez.
+    
+    Args:
+        csv_file: Ruta al archivo CSV con datos CAT048 decodificados
+        chunksize: Filas por bloque de lectura
+    
+    Returns:
+        DataItemArray con las detecciones con callsign válido
+    """
+    stats = new_load_stats()
+    parts = list(iter_csv_chunks(csv_file, stats, chunksize))
     
-    return data_items
+    data = DataItemArray.concatenate(parts) if parts else parse_csv_chunk(pd.DataFrame(), stats)
+    
+    print_load_summary(stats, set(data.callsign.tolist()))
+    
+    return data
 
 
-def filter_data_items(data_items: List[DataItem]) -> List[DataItem]:
+def load_filtered_data_items(csv_file: str, chunksize: int = 100_000):
     """
-    Aplica filtros geográficos y de altitud (diapositivas 33-34).
+    Lee el CSV y aplica los filtros de filter_data_items bloque a bloque,
+    guardando sólo las detecciones que pasan: en memoria hay como mucho un
+    bloque sin filtrar, no el archivo completo. Los mensajes son los mismos
+    que parse_csv_to_dataitem_array + filter_data_items.
+    
+    Args:
+        csv_file: Ruta al archivo CSV con datos CAT048 decodificados
+        chunksize: Filas por bloque de lectura
+    
+    Returns:
+        (DataItemArray filtrado, número de registros válidos antes de filtrar)
     """
-    filtered = []
-    stats = {
-        'total': len(data_items),
-        'geo': 0,
-        'alt': 0,
-        'fl': 0,
-        'passed': 0
-    }
+    stats = new_load_stats()
+    filter_stats = new_filter_stats()
+    unique_callsigns = set()
+    parts = []
+    for chunk in iter_csv_chunks(csv_file, stats, chunksize):
+        unique_callsigns.update(chunk.callsign.tolist())
+        mask = filter_mask(chunk, filter_stats)
+        parts.append(chunk.select(mask))
     
-    for item in data_items:
-        # Filtro geográfico
-        if not item.is_in_geographic_filter():
-            stats['geo'] += 1
-            continue
-        
-        # Filtro altitud
-        if item.barometric_altitude and item.barometric_altitude > 6000:
-            stats['alt'] += 1
-            continue
-        
-        # Filtro FL válido
-        if item.fl is None:
-            stats['fl'] += 1
-            continue
-        
-        filtered.append(item)
-        stats['passed'] += 1
+    data = DataItemArray.concatenate(parts) if parts else parse_csv_chunk(pd.DataFrame(), stats)
+    
+    print_load_summary(stats, unique_callsigns)
+    if stats['valid'] > 0:
+        print_filter_summary(filter_stats)
+    
+    return data, stats['valid']
+
+
+def parse_csv_to_dataitem_list(csv_file: str) -> List[DataItem]:
+    """
+    Lee el archivo CSV decodificado y crea lista de objetos DataItem.
+    Envoltorio de parse_csv_to_dataitem_array para el código que usa objetos.
+    
+    Args:
+        csv_file: Ruta al archivo CSV con datos CAT048 decodificados
     
+    Returns:
+        Lista de objetos DataItem con callsign válido
+    """
+    return parse_csv_to_dataitem_array(csv_file).to_dataitem_list()
+
+
+def new_filter_stats() -> dict:
+    """Contadores de filter_mask."""
+    return {'total': 0, 'geo': 0, 'alt': 0, 'fl': 0, 'passed': 0}
+
+
+def filter_mask(data: DataItemArray, stats: dict) -> np.ndarray:
+    """
+    Máscara de los filtros geográficos y de altitud (diapositivas 33-34).
+    Suma a stats los registros descartados por cada filtro.
+    """
+    # Filtro geográfico
+    geo_mask = data.is_in_geographic_filter()
+    # Filtro altitud (sin altitud o 0 ft no se filtra, como antes)
+    alt_mask = ~(data.barometric_altitude > 6000)
+    # Filtro FL válido
+    fl_mask = ~np.isnan(data.fl)
+    
+    final_mask = geo_mask & alt_mask & fl_mask
+    
+    stats['total'] += len(data)
+    stats['geo'] += int((~geo_mask).sum())
+    stats['alt'] += int((geo_mask & ~alt_mask).sum())
+    stats['fl'] += int((geo_mask & alt_mask & ~fl_mask).sum())
+    stats['passed'] += int(final_mask.sum())
+    
+    return final_mask
+
+
+def print_filter_summary(stats: dict):
+    """Resumen de los filtros aplicados."""
     print(f"\n✓ Filtros aplicados:")
     print(f"  - Total entrada: {stats['total']}")
     print(f"  - Filtrados geografía: {stats['geo']}")
     print(f"  - Filtrados altitud: {stats['alt']}")
     print(f"  - Filtrados FL: {stats['fl']}")
     print(f"  - RESULTADO: {stats['passed']} registros")
+
+
+def filter_data_items(data) -> DataItemArray:
+    """
+    Aplica filtros geográficos y de altitud (diapositivas 33-34).
+    Cada filtro es una máscara booleana sobre las columnas del SoA.
+    
+    Acepta un DataItemArray o una lista de DataItem (p.ej. la de
+    parse_csv_to_dataitem_list), que se convierte al SoA; el resultado es
+    siempre un DataItemArray, el tipo que espera el cálculo de separaciones.
+    """
+    if not isinstance(data, DataItemArray):
+        data = DataItemArray.from_dataitem_list(data)
+    
+    stats = new_filter_stats()
+    final_mask = filter_mask(data, stats)
+    print_filter_summary(stats)
+    
+    return data.select(final_mask)
+
+
+def load_flight_plans(fp_file: str, sheet_name: str = 'Hoja1') -> pd.DataFrame:
+    """
+    Lee la hoja de planes de vuelo del Excel, usando una copia en Parquet
+    junto al archivo original como caché (openpyxl es lento).
+    
+    La caché se regenera cuando el Excel es más reciente que ella. Si no se
+    puede leer o escribir Parquet (p.ej. sin pyarrow) se lee el Excel sin caché.
+    """
+    cache_file = f"{os.path.splitext(fp_file)[0]}.{sheet_name}.parquet"
+    
+    if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(fp_file):
+        try:
+            return pd.read_parquet(cache_file)
+        except (ImportError, OSError, ValueError):
+            pass
+    
+    flight_plans = pd.read_excel(fp_file, sheet_name=sheet_name)
+    
+    try:
+        flight_plans.to_parquet(cache_file, index=False)
+    except (ImportError, OSError, ValueError, TypeError):
+        pass
     
-    return filtered
+    return flight_plans
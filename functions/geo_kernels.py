@@ -0,0 +1,137 @@
+"""
+geo_kernels.py - Núcleos numéricos compilados (numba) de geo_utils y de
+los filtros por registro (zona geográfica, altitud corregida por QNH)
+Proyecto 3 - PGTA
+
+Todos los parámetros se pasan explícitamente (sin valores por defecto de
+constants): los envoltorios públicos de geo_utils rellenan los defaults y
+validan las entradas. Sin fastmath, para que los resultados coincidan bit
+a bit con las versiones en Python/NumPy.
+"""
+
+import math
+import numpy as np
+from numba import njit, prange
+
+
+@njit('UniTuple(f8, 3)(f8, f8, f8, f8, f8)', cache=True, nogil=True)
+def stereographic_kernel(lat, lon, lat0, lon0, R):
+    """
+    Proyección estereográfica de un punto.
+    Devuelve (x, y, denominador); el envoltorio comprueba el denominador.
+    """
+    lat_rad = math.radians(lat)
+    lat0_rad = math.radians(lat0)
+    dlon = math.radians(lon) - math.radians(lon0)
+
+    sin_lat = math.sin(lat_rad)
+    cos_lat = math.cos(lat_rad)
+    sin_lat0 = math.sin(lat0_rad)
+    cos_lat0 = math.cos(lat0_rad)
+    cos_dlon = math.cos(dlon)
+
+    denominator = 1 + sin_lat0 * sin_lat + cos_lat0 * cos_lat * cos_dlon
+    if denominator == 0.0:
+        # Antípoda exacta: sin dividir (numba lanzaría ZeroDivisionError)
+        return math.nan, math.nan, denominator
+    k = (2 * R) / denominator
+
+    x = k * cos_lat * math.sin(dlon)
+    y = k * (cos_lat0 * sin_lat - sin_lat0 * cos_lat * cos_dlon)
+    return x, y, denominator
+
+
+@njit('UniTuple(f8[:], 3)(f8[:], f8[:], f8, f8, f8)', parallel=True, cache=True)
+def stereographic_batch_kernel(lat, lon, lat0, lon0, R):
+    """
+    Proyección estereográfica de un lote de puntos (arrays 1-D),
+    repartida entre hilos con prange.
+    Devuelve (x, y, denominador); el envoltorio comprueba el denominador.
+    """
+    n = lat.shape[0]
+    x = np.empty(n)
+    y = np.empty(n)
+    denominator = np.empty(n)
+
+    lat0_rad = math.radians(lat0)
+    lon0_rad = math.radians(lon0)
+    sin_lat0 = math.sin(lat0_rad)
+    cos_lat0 = math.cos(lat0_rad)
+
+    for i in prange(n):
+        lat_rad = math.radians(lat[i])
+        dlon = math.radians(lon[i]) - lon0_rad
+
+        sin_lat = math.sin(lat_rad)
+        cos_lat = math.cos(lat_rad)
+        cos_dlon = math.cos(dlon)
+
+        denominator[i] = 1 + sin_lat0 * sin_lat + cos_lat0 * cos_lat * cos_dlon
+        if denominator[i] == 0.0:
+            x[i] = math.nan
+            y[i] = math.nan
+            continue
+        k = (2 * R) / denominator[i]
+        x[i] = k * cos_lat * math.sin(dlon)
+        y[i] = k * (cos_lat0 * sin_lat - sin_lat0 * cos_lat * cos_dlon)
+
+    return x, y, denominator
+
+
+@njit('f8(f8, f8, f8, f8)', cache=True, nogil=True)
+def distance_2d_kernel(x1, y1, x2, y2):
+    """Distancia euclídea en el plano proyectado."""
+    return math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+
+
+@njit('f8(f8, f8, f8, f8)', cache=True, nogil=True)
+def bearing_kernel(lat1, lon1, lat2, lon2):
+    """Rumbo en grados (0-360) entre dos puntos geodésicos."""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlon = math.radians(lon2 - lon1)
+    cos_lat2 = math.cos(lat2_rad)
+
+    y = math.sin(dlon) * cos_lat2
+    x = (math.cos(lat1_rad) * math.sin(lat2_rad) -
+         math.sin(lat1_rad) * cos_lat2 * math.cos(dlon))
+
+    bearing = math.degrees(math.atan2(y, x))
+    return (bearing + 360) % 360
+
+
+@njit('b1[:](f8[:], f8[:])', cache=True, nogil=True)
+def geographic_filter_kernel(lat, lon):
+    """
+    Máscara del filtro geográfico (diapositiva 34) en una pasada:
+    40.9° N <= Latitud <= 41.7° N y 1.5° E <= Longitud <= 2.6° E
+    (NaN no pasa el filtro).
+    """
+    n = lat.shape[0]
+    mask = np.empty(n, dtype=np.bool_)
+    for i in range(n):
+        mask[i] = 40.9 <= lat[i] <= 41.7 and 1.5 <= lon[i] <= 2.6
+    return mask
+
+
+@njit('f8[:](f8[:], f8[:], f8[:])', cache=True, nogil=True)
+def barometric_altitude_kernel(fl, h, bp):
+    """
+    Altitud barométrica (ft) de cada registro. Por debajo de 6000 ft se
+    corrige el FL con el QNH (BP si está en 900-1100 hPa, si no QNE;
+    1 hPa ≈ 27 ft); por encima se usa el FL. Sin FL (NaN) se usa h.
+    """
+    n = fl.shape[0]
+    altitude = np.empty(n)
+    for i in range(n):
+        if math.isnan(fl[i]):
+            altitude[i] = h[i]
+            continue
+
+        qnh = bp[i] if 900 < bp[i] < 1100 else 1013.25
+        fl_feet = fl[i] * 100
+        if fl_feet <= 6000:
+            altitude[i] = fl_feet + (qnh - 1013.25) * 27
+        else:
+            altitude[i] = fl_feet
+    return altitude
@@ -5,7 +5,14 @@ Proyecto 3 - PGTA
 
 import math
 from typing import Tuple
+import numpy as np
 import constants
+from functions.geo_kernels import (
+    stereographic_kernel,
+    stereographic_batch_kernel,
+    distance_2d_kernel,
+    bearing_kernel,
+)
 
 
 def geodetic_to_stereographic(lat: float, lon: float,
@@ -16,49 +23,90 @@ def geodetic_to_stereographic(lat: float, lon: float,
     Convierte coordenadas geodésicas (lat, lon) a coordenadas estereográficas (x, y).
     Según diapositiva 42 del proyecto.
     
+    Acepta también arrays NumPy de lat/lon: en ese caso proyecta todo el
+    lote de una vez con funciones trigonométricas vectorizadas.
+    
     Args:
-        lat: Latitud en grados decimales
-        lon: Longitud en grados decimales
+        lat: Latitud en grados decimales (escalar o np.ndarray)
+        lon: Longitud en grados decimales (escalar o np.ndarray)
         lat0: Latitud del centro de proyección (TMA)
         lon0: Longitud del centro de proyección (TMA)
         R: Radio de la esfera conforme en NM
     
     Returns:
-        Tuple (x, y) en millas náuticas
+        Tuple (x, y) en millas náuticas (escalares o arrays)
     """
+    if isinstance(lat, np.ndarray) or isinstance(lon, np.ndarray):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        if not np.all((lat >= -90) & (lat <= 90)):
+            raise ValueError("Latitud fuera de rango en el lote. Debe estar entre -90 y 90")
+        if not np.all((lon >= -180) & (lon <= 180)):
+            raise ValueError("Longitud fuera de rango en el lote. Debe estar entre -180 y 180")
+        x, y, denominator = _geodetic_to_stereographic_np(lat, lon, lat0, lon0, R)
+        small = np.abs(denominator) < 1e-10
+        if small.any():
+            raise ValueError(f"Denominador muy pequeño en proyección: {denominator[small].flat[0]}")
+        return x, y
+    
     # Validar que las coordenadas están en rangos válidos
     if not (-90 <= lat <= 90):
         raise ValueError(f"Latitud fuera de rango: {lat}. Debe estar entre -90 y 90")
     if not (-180 <= lon <= 180):
         raise ValueError(f"Longitud fuera de rango: {lon}. Debe estar entre -180 y 180")
     
-    # Convertir a radianes
-    lat_rad = math.radians(lat)
-    lon_rad = math.radians(lon)
-    lat0_rad = math.radians(lat0)
-    lon0_rad = math.radians(lon0)
-    
-    # Cálculo de la proyección estereográfica
+    # Cálculo de la proyección estereográfica (núcleo compilado)
     # Fórmula según Eurocontrol Translib / geoutils
-    dlon = lon_rad - lon0_rad
-    
-    # Factor de escala k
-    denominator = 1 + math.sin(lat0_rad) * math.sin(lat_rad) + \
-                  math.cos(lat0_rad) * math.cos(lat_rad) * math.cos(dlon)
+    x, y, denominator = stereographic_kernel(lat, lon, lat0, lon0, R)
     
     if abs(denominator) < 1e-10:
         raise ValueError(f"Denominador muy pequeño en proyección: {denominator}")
     
-    k = (2 * R) / denominator
-    
-    # Coordenadas proyectadas
-    x = k * math.cos(lat_rad) * math.sin(dlon)
-    y = k * (math.cos(lat0_rad) * math.sin(lat_rad) -
-             math.sin(lat0_rad) * math.cos(lat_rad) * math.cos(dlon))
-    
     return x, y
 
 
+def geodetic_to_stereographic_batch(lat: np.ndarray, lon: np.ndarray,
+                                    lat0: float = constants.TMA_CENTER_LAT,
+                                    lon0: float = constants.TMA_CENTER_LON,
+                                    R: float = constants.RADIO_ESFERA_CONFORME_NM
+                                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Proyecta un lote de puntos sin lanzar excepciones: devuelve (x, y, válido),
+    donde válido marca los puntos que geodetic_to_stereographic aceptaría
+    (lat/lon en rango y denominador no despreciable). x/y de los puntos no
+    válidos no tienen sentido y deben descartarse.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    x, y, denominator = _geodetic_to_stereographic_np(lat, lon, lat0, lon0, R)
+    valid = (
+        (lat >= -90) & (lat <= 90) &
+        (lon >= -180) & (lon <= 180) &
+        ~(np.abs(denominator) < 1e-10)
+    )
+    return x, y, valid
+
+
+def _geodetic_to_stereographic_np(lat: np.ndarray, lon: np.ndarray,
+                                  lat0: float = constants.TMA_CENTER_LAT,
+                                  lon0: float = constants.TMA_CENTER_LON,
+                                  R: float = constants.RADIO_ESFERA_CONFORME_NM
+                                  ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Misma proyección que geodetic_to_stereographic, aplicada sobre arrays NumPy.
+    No valida rangos ni el denominador: devuelve (x, y, denominador) y la
+    comprobación queda para quien la llama.
+    El cálculo lo hace stereographic_batch_kernel (numba, en paralelo).
+    """
+    lat, lon = np.broadcast_arrays(lat, lon)
+    x, y, denominator = stereographic_batch_kernel(
+        np.ascontiguousarray(lat, dtype=np.float64).ravel(),
+        np.ascontiguousarray(lon, dtype=np.float64).ravel(),
+        lat0, lon0, R
+    )
+    return x.reshape(lat.shape), y.reshape(lat.shape), denominator.reshape(lat.shape)
+
+
 def calculate_distance_2d(x1: float, y1: float, x2: float, y2: float) -> float:
     """
     Calcula la distancia 2D entre dos puntos en el plano proyectado.
@@ -70,8 +118,7 @@ def calculate_distance_2d(x1: float, y1: float, x2: float, y2: float) -> float:
     Returns:
         Distancia en millas náuticas
     """
-    distance = math.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-    return distance
+    return distance_2d_kernel(x1, y1, x2, y2)
 
 
 def calculate_distance_to_threshold(lat: float, lon: float,
@@ -91,6 +138,24 @@ def calculate_distance_to_threshold(lat: float, lon: float,
     return calculate_distance_2d(x1, y1, x2, y2)
 
 
+def calculate_distance_to_threshold_vec(lat: np.ndarray, lon: np.ndarray,
+                                        thr_lat: float, thr_lon: float) -> np.ndarray:
+    """
+    Versión vectorizada de calculate_distance_to_threshold.
+    
+    Args:
+        lat, lon: Arrays de coordenadas en grados decimales
+        thr_lat, thr_lon: Coordenadas del umbral en grados decimales
+    
+    Returns:
+        Array de distancias en millas náuticas
+    """
+    x1, y1 = geodetic_to_stereographic(np.asarray(lat, dtype=np.float64),
+                                       np.asarray(lon, dtype=np.float64))
+    x2, y2 = geodetic_to_stereographic(thr_lat, thr_lon)
+    return np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+
+
 def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calcula el rumbo (bearing) entre dos puntos geodésicos.
@@ -102,16 +167,7 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     Returns:
         Rumbo en grados (0-360)
     """
-    lat1_rad = math.radians(lat1)
-    lat2_rad = math.radians(lat2)
-    dlon = math.radians(lon2 - lon1)
-    
-    y = math.sin(dlon) * math.cos(lat2_rad)
-    x = (math.cos(lat1_rad) * math.sin(lat2_rad) -
-         math.sin(lat1_rad) * math.cos(lat2_rad) * math.cos(dlon))
-    
-    bearing = math.degrees(math.atan2(y, x))
-    return (bearing + 360) % 360
+    return bearing_kernel(lat1, lon1, lat2, lon2)
 
 
 def test_projection():
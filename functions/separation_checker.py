@@ -3,7 +3,9 @@ separation_checker.py - Funciones para verificar separaciones mínimas
 Proyecto 3 - PGTA
 """
 
+from functools import lru_cache
 from typing import Tuple, Optional
+import numpy as np
 import constants
 import math
 
@@ -28,6 +30,32 @@ def check_radar_separation(distance_nm: float, zone: str = 'TWR') -> bool:
     return distance_nm < minima_nm
 
 
+def check_radar_separation_batch(distances_nm: np.ndarray, zone: str = 'TWR') -> np.ndarray:
+    """
+    Versión vectorizada de check_radar_separation para un array de distancias.
+    Las distancias NaN (sin dato) no cuentan como incumplimiento.
+    """
+    distances_nm = np.asarray(distances_nm, dtype=np.float64)
+    
+    if np.isinf(distances_nm).any():
+        raise ValueError("Distancia inválida (infinita) en el lote")
+    
+    if (distances_nm < 0).any():
+        raise ValueError("Distancia negativa en el lote")
+    
+    zone_upper = zone.upper()
+    
+    if zone_upper == 'TWR':
+        minima_nm = constants.MINIMA_RADAR_TWR_NM
+    elif zone_upper == 'TMA':
+        minima_nm = constants.MINIMA_RADAR_TMA_NM
+    else:
+        raise ValueError(f"Zona no válida: '{zone}'. Debe ser 'TWR' o 'TMA'")
+    
+    # NaN < minima es False: sin dato no hay incumplimiento
+    return distances_nm < minima_nm
+
+
 # Mapeo COMPLETO de categorías de estela
 WAKE_CATEGORY_MAPPING = {
     # Español
@@ -53,19 +81,66 @@ WAKE_CATEGORY_MAPPING = {
 }
 
 
+@lru_cache(maxsize=64)
+def _normalize_wake_string(wake: str) -> str:
+    """Mapeo de un texto de estela (pocos valores distintos: se memoriza)."""
+    return WAKE_CATEGORY_MAPPING.get(wake.strip().upper(), 'UNKNOWN')
+
+
 def normalize_wake_category(wake: Optional[str]) -> str:
     """Normaliza la categoría de estela a formato estándar."""
-    if wake is None or wake == '-' or wake == '':
+    # None, NaN u otros tipos no son categorías válidas; '-' y '' → UNKNOWN en el mapeo
+    if not isinstance(wake, str):
         return 'UNKNOWN'
     
-    wake_upper = str(wake).strip().upper()
+    return _normalize_wake_string(wake)
+
+
+# Códigos enteros de categoría de estela (índices de WAKE_SEPARATION_TABLE)
+WAKE_CATEGORY_CODES = {
+    'SUPER': 0,
+    'HEAVY': 1,
+    'MEDIUM': 2,
+    'LIGHT': 3,
+    'UNKNOWN': 4,
+}
+
+# Tabla 2-D [precedente, siguiente] con la separación por estela (NM).
+# 0 = no aplica separación por estela para esa combinación.
+WAKE_SEPARATION_TABLE = np.zeros(
+    (len(WAKE_CATEGORY_CODES), len(WAKE_CATEGORY_CODES)),
+    dtype=np.result_type(*constants.WAKE_TURBULENCE_SEPARATION.values())
+)
+for (_prec, _foll), _sep in constants.WAKE_TURBULENCE_SEPARATION.items():
+    WAKE_SEPARATION_TABLE[WAKE_CATEGORY_CODES[_prec], WAKE_CATEGORY_CODES[_foll]] = _sep
+
+
+def wake_category_codes(wakes) -> np.ndarray:
+    """Códigos de WAKE_CATEGORY_CODES (int8) para una secuencia de categorías sin normalizar."""
+    return np.fromiter(
+        (WAKE_CATEGORY_CODES[normalize_wake_category(wake)] for wake in wakes),
+        dtype=np.int8
+    )
+
+
+def check_wake_turbulence_separation_batch(
+    preceding_codes: np.ndarray,
+    following_codes: np.ndarray,
+    distances_nm: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Versión vectorizada de check_wake_turbulence_separation.
     
-    # Intentar mapeo directo
-    if wake_upper in WAKE_CATEGORY_MAPPING:
-        return WAKE_CATEGORY_MAPPING[wake_upper]
+    Recibe los códigos de categoría (WAKE_CATEGORY_CODES) de cada pareja y
+    sus distancias. Devuelve (incumplimientos, separación requerida en NM);
+    la separación es NaN y el incumplimiento False donde no aplica estela.
+    """
+    required = WAKE_SEPARATION_TABLE[preceding_codes, following_codes].astype(np.float64)
+    required[required == 0] = np.nan
     
-    # Si no existe, devolver UNKNOWN
-    return 'UNKNOWN'
+    # Las comparaciones con NaN son False: sin mínimo (o sin distancia) no hay incumplimiento
+    violations = np.asarray(distances_nm, dtype=np.float64) < required
+    return violations, required
 
 
 def check_wake_turbulence_separation(
@@ -78,32 +153,46 @@ def check_wake_turbulence_separation(
     Verifica si se cumple la separación por estela turbulenta.
     Aplicable tanto en TWR como en TMA.
     """
+    if debug:
+        return _check_wake_turbulence_separation_debug(preceding_wake, following_wake, distance_nm)
+    
+    # Si alguna es desconocida o la combinación no está en tabla, no aplica
+    key = (normalize_wake_category(preceding_wake), normalize_wake_category(following_wake))
+    required_separation = constants.WAKE_TURBULENCE_SEPARATION.get(key)
+    if required_separation is None:
+        return False, None
+    
+    return distance_nm < required_separation, required_separation
+
+
+def _check_wake_turbulence_separation_debug(
+    preceding_wake: str,
+    following_wake: str,
+    distance_nm: float
+) -> Tuple[bool, Optional[float]]:
+    """Igual que check_wake_turbulence_separation, mostrando cada paso."""
     # Normalizar categorías
     prec_wake = normalize_wake_category(preceding_wake)
     foll_wake = normalize_wake_category(following_wake)
     
-    if debug:
-        print(f"    [WAKE] Prec={preceding_wake}→{prec_wake}, Foll={following_wake}→{foll_wake}, Dist={distance_nm:.2f} NM")
+    print(f"    [WAKE] Prec={preceding_wake}→{prec_wake}, Foll={following_wake}→{foll_wake}, Dist={distance_nm:.2f} NM")
     
     # Si alguna es desconocida, no aplica separación por estela
     if prec_wake == 'UNKNOWN' or foll_wake == 'UNKNOWN':
-        if debug:
-            print(f"    [WAKE] ❌ Alguna categoría UNKNOWN → No aplica separación")
+        print(f"    [WAKE] ❌ Alguna categoría UNKNOWN → No aplica separación")
         return False, None
     
     key = (prec_wake, foll_wake)
     
     if key not in constants.WAKE_TURBULENCE_SEPARATION:
-        if debug:
-            print(f"    [WAKE] ⚠️  Combinación {key} NO está en tabla → No aplica separación")
+        print(f"    [WAKE] ⚠️  Combinación {key} NO está en tabla → No aplica separación")
         return False, None  # No aplica separación por estela
     
     required_separation = constants.WAKE_TURBULENCE_SEPARATION[key]
     incumplimiento = distance_nm < required_separation
     
-    if debug:
-        status = "❌ INCUMPLIMIENTO" if incumplimiento else "✅ OK"
-        print(f"    [WAKE] {status}: {distance_nm:.2f} < {required_separation} NM")
+    status = "❌ INCUMPLIMIENTO" if incumplimiento else "✅ OK"
+    print(f"    [WAKE] {status}: {distance_nm:.2f} < {required_separation} NM")
     
     return incumplimiento, required_separation
 
@@ -3,16 +3,37 @@ main.py - Programa principal
 Proyecto 3 - PGTA
 """
 
+import numpy as np
 import pandas as pd
 import os
 import sys
 from typing import List
 from models.DataItems import DataItem
-from functions.data_loader import parse_csv_to_dataitem_list, filter_data_items
-from functions.calculate_separations_between_consecutive_departures import calculate_separations_between_consecutive_departures
+from functions.data_loader import load_filtered_data_items, load_flight_plans
+from functions.calculate_separations_between_consecutive_departures import (
+    calculate_separations_between_consecutive_departures,
+    REPORT_NA_COLUMNS,
+)
 import constants
 
 
+def write_report(results: pd.DataFrame, output_file: str):
+    """
+    Escribe un informe CSV (los valores ausentes de estela se escriben 'NA')
+    y, si hay pyarrow, una copia Parquet al lado con los tipos originales
+    (booleanos/enteros nullable), más rápida de escribir y de releer.
+    """
+    na_columns = [c for c in REPORT_NA_COLUMNS if c in results.columns]
+    report = results.astype({c: object for c in na_columns})
+    report[na_columns] = report[na_columns].fillna('NA')
+    report.to_csv(output_file, index=False, sep=';', encoding='utf-8')
+    
+    try:
+        results.to_parquet(f"{os.path.splitext(output_file)[0]}.parquet", index=False)
+    except (ImportError, OSError, ValueError, TypeError):
+        pass
+
+
 def main():
     """Función principal del programa."""
     
@@ -28,16 +49,14 @@ def main():
         print(f"   Verifica que existe la carpeta 'Inputs' con el archivo CSV")
         sys.exit(1)
     
-    data_items = parse_csv_to_dataitem_list(csv_file)
+    # 2. Aplicar filtros bloque a bloque mientras se lee el CSV
+    filtered_data, total_valid = load_filtered_data_items(csv_file)
     
-    if len(data_items) == 0:
+    if total_valid == 0:
         print("\n❌ ERROR CRÍTICO: No se cargaron datos radar")
         print("   Verifica que la columna 'TI' contiene callsigns válidos")
         sys.exit(1)
     
-    # 2. Aplicar filtros
-    filtered_data = filter_data_items(data_items)
-    
     if len(filtered_data) == 0:
         print("\n⚠️  ADVERTENCIA: Todos los datos filtrados")
         print("   Revisa los criterios de filtrado")
@@ -51,7 +70,7 @@ def main():
         sys.exit(1)
     
     print(f"\nCargando planes de vuelo...")
-    flight_plans = pd.read_excel(fp_file, sheet_name='Hoja1')
+    flight_plans = load_flight_plans(fp_file, sheet_name='Hoja1')
     print(f"✓ Cargados {len(flight_plans)} planes de vuelo")
     
     # 4. Calcular separaciones
@@ -67,112 +86,137 @@ def main():
     all_results = pd.concat([results_24l, results_06r], ignore_index=True)
     
     output_file = "separations_results.csv"
-    all_results.to_csv(output_file, index=False, sep=';', encoding='utf-8')
+    write_report(all_results, output_file)
     print(f"\n✓ Resultados → {output_file}")
     
-    # 6. Estadísticas detalladas
-    print("\n" + "="*80)
-    print("ESTADÍSTICAS DE SEPARACIONES")
-    print("="*80)
-    
+    # 6. Estadísticas detalladas (se escriben a stdout de una sola vez)
+    lines = [
+        "\n" + "="*80,
+        "ESTADÍSTICAS DE SEPARACIONES",
+        "="*80,
+    ]
+    try:
+        report_statistics(all_results, lines)
+        lines += [
+            "\n" + "="*80,
+            "COMPLETADO",
+            "="*80 + "\n",
+        ]
+    finally:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
+def report_statistics(all_results: pd.DataFrame, lines: List[str]):
+    """
+    Estadísticas detalladas de separaciones. Los mensajes se añaden a
+    lines en lugar de imprimirse uno a uno; main los escribe de una vez.
+    También guarda el CSV de incumplimientos si los hay.
+    """
     if len(all_results) > 0:
         total = len(all_results)
         
-        # Contar incumplimientos radar (son booleanos)
-        inc_radar_twr = int(all_results['Inc_Radar_TWR'].sum())
-        inc_radar_tma = int(all_results['Inc_Radar_TMA'].sum())
+        # Pista y categorías de estela tienen muy pocos valores distintos:
+        # como categóricas, las agrupaciones trabajan sobre códigos enteros
+        # (sólo estas columnas, en un frame aparte: all_results y los
+        # incumplimientos que se guardan conservan sus tipos)
+        stats_keys = all_results[['Runway', 'Wake_Preceding', 'Wake_Following']].astype('category')
+        
+        # Columnas de incumplimiento a NumPy una sola vez: los totales y la
+        # máscara de incumplimientos salen de estos arrays sin volver a
+        # recorrer el DataFrame
+        # Inc_Wake_TWR y Inc_Wake_TMA son booleanos nullable (NA = no aplica)
+        r_twr = all_results['Inc_Radar_TWR'].to_numpy(dtype=bool)
+        r_tma = all_results['Inc_Radar_TMA'].to_numpy(dtype=bool)
+        w_twr_na = all_results['Inc_Wake_TWR'].isna().to_numpy()
+        w_tma_na = all_results['Inc_Wake_TMA'].isna().to_numpy()
+        w_twr = all_results['Inc_Wake_TWR'].to_numpy(dtype=bool, na_value=False)
+        w_tma = all_results['Inc_Wake_TMA'].to_numpy(dtype=bool, na_value=False)
+        any_inc = r_twr | r_tma | w_twr | w_tma
         
-        # Contar incumplimientos estela (filtrar 'NA' y contar True)
-        # Inc_Wake_TWR y Inc_Wake_TMA son True/False/'NA'
-        wake_twr_applicable = all_results[all_results['Inc_Wake_TWR'] != 'NA']
-        wake_tma_applicable = all_results[all_results['Inc_Wake_TMA'] != 'NA']
+        # Contar incumplimientos radar
+        inc_radar_twr = int(np.count_nonzero(r_twr))
+        inc_radar_tma = int(np.count_nonzero(r_tma))
         
         # Contar cuántas parejas tienen separación por estela aplicable
-        wake_twr_cases = len(wake_twr_applicable)
-        wake_tma_cases = len(wake_tma_applicable)
+        wake_twr_cases = total - int(np.count_nonzero(w_twr_na))
+        wake_tma_cases = total - int(np.count_nonzero(w_tma_na))
         
-        # Contar incumplimientos (True = incumplimiento)
-        inc_wake_twr = int(wake_twr_applicable['Inc_Wake_TWR'].sum()) if wake_twr_cases > 0 else 0
-        inc_wake_tma = int(wake_tma_applicable['Inc_Wake_TMA'].sum()) if wake_tma_cases > 0 else 0
+        # Contar incumplimientos estela (True = incumplimiento, NA cuenta como False)
+        inc_wake_twr = int(np.count_nonzero(w_twr))
+        inc_wake_tma = int(np.count_nonzero(w_tma))
         
         # Resumen general
-        print(f"\n📊 RESUMEN GENERAL:")
-        print(f"   Total parejas analizadas: {total}")
+        lines.append(f"\n📊 RESUMEN GENERAL:")
+        lines.append(f"   Total parejas analizadas: {total}")
         
         # Estadísticas TWR
-        print(f"\n🛫 ZONA TWR (primera detección ≥ 0.5 NM):")
-        print(f"   Mínima radar: {constants.MINIMA_RADAR_TWR_NM} NM")
-        print(f"   • Incumplimientos radar: {inc_radar_twr}/{total} ({inc_radar_twr/total*100:.1f}%)")
+        lines.append(f"\n🛫 ZONA TWR (primera detección ≥ 0.5 NM):")
+        lines.append(f"   Mínima radar: {constants.MINIMA_RADAR_TWR_NM} NM")
+        lines.append(f"   • Incumplimientos radar: {inc_radar_twr}/{total} ({inc_radar_twr/total*100:.1f}%)")
         
         if wake_twr_cases > 0:
-            print(f"   • Parejas con separación estela aplicable: {wake_twr_cases}/{total} ({wake_twr_cases/total*100:.1f}%)")
-            print(f"   • Incumplimientos estela: {inc_wake_twr}/{wake_twr_cases} ({inc_wake_twr/wake_twr_cases*100:.1f}%)")
+            lines.append(f"   • Parejas con separación estela aplicable: {wake_twr_cases}/{total} ({wake_twr_cases/total*100:.1f}%)")
+            lines.append(f"   • Incumplimientos estela: {inc_wake_twr}/{wake_twr_cases} ({inc_wake_twr/wake_twr_cases*100:.1f}%)")
         else:
-            print(f"   • Incumplimientos estela: N/A (no aplica a ninguna pareja)")
+            lines.append(f"   • Incumplimientos estela: N/A (no aplica a ninguna pareja)")
         
         # Estadísticas TMA
-        print(f"\n✈️  ZONA TMA (resto de detecciones):")
-        print(f"   Mínima radar: {constants.MINIMA_RADAR_TMA_NM} NM")
-        print(f"   • Incumplimientos radar: {inc_radar_tma}/{total} ({inc_radar_tma/total*100:.1f}%)")
+        lines.append(f"\n✈️  ZONA TMA (resto de detecciones):")
+        lines.append(f"   Mínima radar: {constants.MINIMA_RADAR_TMA_NM} NM")
+        lines.append(f"   • Incumplimientos radar: {inc_radar_tma}/{total} ({inc_radar_tma/total*100:.1f}%)")
         
         if wake_tma_cases > 0:
-            print(f"   • Parejas con separación estela aplicable: {wake_tma_cases}/{total} ({wake_tma_cases/total*100:.1f}%)")
-            print(f"   • Incumplimientos estela: {inc_wake_tma}/{wake_tma_cases} ({inc_wake_tma/wake_tma_cases*100:.1f}%)")
+            lines.append(f"   • Parejas con separación estela aplicable: {wake_tma_cases}/{total} ({wake_tma_cases/total*100:.1f}%)")
+            lines.append(f"   • Incumplimientos estela: {inc_wake_tma}/{wake_tma_cases} ({inc_wake_tma/wake_tma_cases*100:.1f}%)")
         else:
-            print(f"   • Incumplimientos estela: N/A (no aplica a ninguna pareja)")
+            lines.append(f"   • Incumplimientos estela: N/A (no aplica a ninguna pareja)")
         
         # Estadísticas por pista
-        print(f"\n🛬 ESTADÍSTICAS POR PISTA:")
+        lines.append(f"\n🛬 ESTADÍSTICAS POR PISTA:")
+        # Una sola agrupación por pista en lugar de una máscara por pista;
+        # se recorre en el orden fijo 24L, 06R
+        runway_groups = dict(iter(all_results.groupby(stats_keys['Runway'], sort=False, observed=True)))
         for rwy in ['24L', '06R']:
-            rwy_data = all_results[all_results['Runway'] == rwy]
-            if len(rwy_data) > 0:
+            rwy_data = runway_groups.get(rwy)
+            if rwy_data is not None and len(rwy_data) > 0:
                 rwy_total = len(rwy_data)
-                rwy_inc_radar_twr = int(rwy_data['Inc_Radar_TWR'].sum())
-                rwy_inc_radar_tma = int(rwy_data['Inc_Radar_TMA'].sum())
+                rwy_inc_radar_twr = int(np.count_nonzero(rwy_data['Inc_Radar_TWR'].to_numpy()))
+                rwy_inc_radar_tma = int(np.count_nonzero(rwy_data['Inc_Radar_TMA'].to_numpy()))
                 
-                print(f"\n   Pista {rwy}: {rwy_total} parejas")
-                print(f"   • Inc. radar TWR: {rwy_inc_radar_twr} ({rwy_inc_radar_twr/rwy_total*100:.1f}%)")
-                print(f"   • Inc. radar TMA: {rwy_inc_radar_tma} ({rwy_inc_radar_tma/rwy_total*100:.1f}%)")
+                lines.append(f"\n   Pista {rwy}: {rwy_total} parejas")
+                lines.append(f"   • Inc. radar TWR: {rwy_inc_radar_twr} ({rwy_inc_radar_twr/rwy_total*100:.1f}%)")
+                lines.append(f"   • Inc. radar TMA: {rwy_inc_radar_tma} ({rwy_inc_radar_tma/rwy_total*100:.1f}%)")
         
         # Distribución de categorías de estela
-        print(f"\n📋 DISTRIBUCIÓN DE CATEGORÍAS DE ESTELA:")
-        wake_combinations = all_results.groupby(['Wake_Preceding', 'Wake_Following']).size().sort_values(ascending=False)
+        lines.append(f"\n📋 DISTRIBUCIÓN DE CATEGORÍAS DE ESTELA:")
+        wake_combinations = stats_keys.groupby(['Wake_Preceding', 'Wake_Following'], observed=True).size().sort_values(ascending=False)
         
-        print(f"   Top 5 combinaciones:")
+        lines.append(f"   Top 5 combinaciones:")
         for idx, (combo, count) in enumerate(wake_combinations.head(5).items(), 1):
             prec, foll = combo
-            print(f"   {idx}. {prec} → {foll}: {count} parejas ({count/total*100:.1f}%)")
+            lines.append(f"   {idx}. {prec} → {foll}: {count} parejas ({count/total*100:.1f}%)")
         
         # Detalle de incumplimientos si los hay
         total_inc = inc_radar_twr + inc_radar_tma + inc_wake_twr + inc_wake_tma
         
         if total_inc > 0:
-            print(f"\n⚠️  TOTAL INCUMPLIMIENTOS DETECTADOS: {total_inc}")
+            lines.append(f"\n⚠️  TOTAL INCUMPLIMIENTOS DETECTADOS: {total_inc}")
             
             # Guardar solo incumplimientos
-            incumplimientos = all_results[
-                (all_results['Inc_Radar_TWR'] == True) | 
-                (all_results['Inc_Radar_TMA'] == True) |
-                (all_results['Inc_Wake_TWR'] == True) |
-                (all_results['Inc_Wake_TMA'] == True)
-            ]
+            incumplimientos = all_results[any_inc]
             
             if len(incumplimientos) > 0:
                 inc_file = "incumplimientos_separaciones.csv"
-                incumplimientos.to_csv(inc_file, index=False, sep=';', encoding='utf-8')
-                print(f"   → Detalles guardados en: {inc_file}")
+                write_report(incumplimientos, inc_file)
+                lines.append(f"   → Detalles guardados en: {inc_file}")
         else:
-            print(f"\n✅ NO SE DETECTARON INCUMPLIMIENTOS")
-            print(f"   • Todas las separaciones cumplen con las mínimas requeridas")
-            print(f"   • Nota: La mayoría de parejas son MEDIUM→MEDIUM (no aplica estela)")
+            lines.append(f"\n✅ NO SE DETECTARON INCUMPLIMIENTOS")
+            lines.append(f"   • Todas las separaciones cumplen con las mínimas requeridas")
+            lines.append(f"   • Nota: La mayoría de parejas son MEDIUM→MEDIUM (no aplica estela)")
         
     else:
-        print("\n⚠️  No se analizaron parejas")
-        print("   Verifica que los callsigns del radar coinciden con los planes de vuelo")
-    
-    print("\n" + "="*80)
-    print("COMPLETADO")
-    print("="*80 + "\n")
+        lines.append("\n⚠️  No se analizaron parejas")
+        lines.append("   Verifica que los callsigns del radar coinciden con los planes de vuelo")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+# data_item_array.py
+from dataclasses import dataclass, fields
+from typing import List
+import numpy as np
+from models.DataItems import DataItem
+from functions.geo_kernels import geographic_filter_kernel
+
+# Campos opcionales de DataItem: en los arrays se guardan como NaN / None
+_OPTIONAL_FLOAT_FIELDS = (
+    'x', 'y', 'fl', 'barometric_altitude',
+    'bds40_bp',
+    'bds50_roll_angle', 'bds50_true_track_angle', 'bds50_ground_speed',
+    'bds50_track_angle_rate', 'bds50_true_airspeed',
+    'bds60_magnetic_heading', 'bds60_indicated_airspeed',
+    'bds60_barometric_altitude_rate', 'bds60_inertial_vertical_velocity',
+)
+
+# Campos de texto: arrays de objetos
+_OBJECT_FIELDS = ('callsign', 'target_address', 'mode_3a', 'flight_status')
+
+
+@dataclass
+class DataItemArray:
+    """
+    Conjunto de registros radar CAT048 en formato Struct-of-Arrays (SoA).
+    Mismos campos que DataItem, pero cada uno es un np.ndarray con una
+    posición por detección, de modo que filtros y cálculos se hacen con
+    operaciones vectorizadas en lugar de recorrer objetos uno a uno.
+
+    Los campos float opcionales de DataItem usan NaN en lugar de None;
+    los de texto (callsign, target_address, mode_3a, flight_status) son
+    arrays de objetos.
+    """
+
+    # Identificación y posición
+    time: np.ndarray  # float64 - ToD (segundos desde medianoche)
+    track_number: np.ndarray  # int64
+    callsign: np.ndarray  # object
+    target_address: np.ndarray  # object (None si no hay)
+    mode_3a: np.ndarray  # object (None si no hay)
+
+    # Coordenadas polares
+    rho: np.ndarray
+    theta: np.ndarray
+
+    # Coordenadas geodésicas
+    lat: np.ndarray
+    lon: np.ndarray
+    h: np.ndarray
+
+    # Coordenadas cartesianas (proyección estereográfica)
+    x: np.ndarray
+    y: np.ndarray
+
+    # Altitud y nivel de vuelo
+    fl: np.ndarray
+    barometric_altitude: np.ndarray
+
+    # Estado de vuelo
+    flight_status: np.ndarray  # object
+
+    # BDS 4.0 / 5.0 / 6.0
+    bds40_bp: np.ndarray
+    bds50_roll_angle: np.ndarray
+    bds50_true_track_angle: np.ndarray
+    bds50_ground_speed: np.ndarray
+    bds50_track_angle_rate: np.ndarray
+    bds50_true_airspeed: np.ndarray
+    bds60_magnetic_heading: np.ndarray
+    bds60_indicated_airspeed: np.ndarray
+    bds60_barometric_altitude_rate: np.ndarray
+    bds60_inertial_vertical_velocity: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index):
+        """
+        Con un entero devuelve esa fila como DataItem (adaptador para el
+        código que trabaja registro a registro); con un slice, máscara o
+        array de índices devuelve un DataItemArray (ver select).
+        """
+        if isinstance(index, (int, np.integer)):
+            return DataItem(**{f.name: self._row_value(f.name, index) for f in fields(self)})
+        return self.select(index)
+
+    def _row_value(self, name: str, index: int):
+        """Valor de una celda como tipo Python (NaN → None en campos opcionales)."""
+        value = getattr(self, name)[index]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if name in _OPTIONAL_FLOAT_FIELDS and value != value:
+            return None
+        return value
+
+    def select(self, index) -> 'DataItemArray':
+        """
+        Devuelve un nuevo DataItemArray con las filas indicadas
+        (máscara booleana o array de índices), aplicado a todas las columnas.
+        """
+        return DataItemArray(**{f.name: getattr(self, f.name)[index] for f in fields(self)})
+
+    @classmethod
+    def concatenate(cls, parts: List['DataItemArray']) -> 'DataItemArray':
+        """Une varios DataItemArray (p.ej. bloques del CSV) en uno solo."""
+        return cls(**{f.name: np.concatenate([getattr(p, f.name) for p in parts])
+                      for f in fields(cls)})
+
+    def is_in_geographic_filter(self) -> np.ndarray:
+        """
+        Máscara del filtro geográfico (diapositiva 34), igual que
+        DataItem.is_in_geographic_filter pero para todas las filas:
+        40.9° N < Latitud < 41.7° N
+        1.5° E < Longitud < 2.6° E
+        """
+        return geographic_filter_kernel(self.lat, self.lon)
+
+    @classmethod
+    def from_dataitem_list(cls, items: List[DataItem]) -> 'DataItemArray':
+        """Crea el SoA a partir de una lista de DataItem (None → NaN en campos opcionales)."""
+        columns = {}
+        for f in fields(cls):
+            values = [getattr(item, f.name) for item in items]
+            if f.name in _OPTIONAL_FLOAT_FIELDS:
+                columns[f.name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            elif f.name in _OBJECT_FIELDS:
+                column = np.empty(len(values), dtype=object)
+                column[:] = values
+                columns[f.name] = column
+            elif f.name == 'track_number':
+                columns[f.name] = np.array(values, dtype=np.int64)
+            else:
+                columns[f.name] = np.array(values, dtype=np.float64)
+        return cls(**columns)
+
+    def to_dataitem_list(self) -> List[DataItem]:
+        """Convierte el SoA en una lista de DataItem (NaN → None en campos opcionales)."""
+        columns = []
+        for f in fields(self):
+            values = getattr(self, f.name).tolist()
+            if f.name in _OPTIONAL_FLOAT_FIELDS:
+                values = [None if v != v else v for v in values]
+            columns.append(values)
+
+        names = [f.name for f in fields(self)]
+        return [DataItem(**dict(zip(names, row))) for row in zip(*columns)]
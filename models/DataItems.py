@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class DataItem:
     """
     Clase que representa un registro de datos radar decodificados CAT048.